@@ -1,6 +1,6 @@
 # AD MCP Bridge Server
 from .server import mcp, main
-from .config import Settings
+from .config import Settings, get_settings
 
 __version__ = "1.0.0"
-__all__ = ["mcp", "main", "Settings"]
+__all__ = ["mcp", "main", "Settings", "get_settings"]
@@ -1,4 +1,5 @@
 """Configuration settings for MCP Bridge Server"""
+from functools import lru_cache
 from pydantic_settings import BaseSettings
 from pydantic import Field
 from typing import Optional
@@ -66,6 +67,16 @@ class Settings(BaseSettings):
         description="Request timeout in seconds",
         alias="ODOO_TIMEOUT"
     )
+    schema_cache_ttl: int = Field(
+        default=60,
+        description="Seconds to cache model and field definitions (0 disables)",
+        alias="ODOO_SCHEMA_CACHE_TTL"
+    )
+    debug_pretty_json: bool = Field(
+        default=False,
+        description="Indent JSON output (for debugging; compact output uses fewer tokens)",
+        alias="ODOO_DEBUG_PRETTY_JSON"
+    )
     
     class Config:
         env_file = ".env"
@@ -86,5 +97,7 @@ class Settings(BaseSettings):
         return self.has_api_key or self.has_credentials
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the global settings, loading .env and environment on first use"""
+    return Settings()
@@ -1,8 +1,121 @@
 """Odoo HTTP client for MCP Bridge Server"""
-import json
+import asyncio
+import functools
+import time
 import httpx
-from typing import Any, Optional
-from .config import settings
+import ijson
+import orjson
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+from .config import get_settings
+
+
+# Display-name memo: at most this many (model, id) entries, each valid for 60s
+_NAME_CACHE_SIZE = 1024
+_NAME_CACHE_TTL = 60.0
+
+# Upper bound on concurrent reads issued by read_many
+_READ_MANY_CONCURRENCY = 10
+
+# Everything but params is constant in a JSON-RPC call, so only params is serialized
+_ENVELOPE_PREFIX = b'{"jsonrpc":"2.0","method":"call","id":1,"params":'
+_ENVELOPE_SUFFIX = b'}'
+
+
+def _envelope(params: dict) -> bytes:
+    """Encode a JSON-RPC call envelope around params"""
+    return _ENVELOPE_PREFIX + orjson.dumps(params) + _ENVELOPE_SUFFIX
+
+
+# Gateway errors worth retrying; 4xx business errors are returned immediately
+_RETRY_STATUS_CODES = frozenset({502, 503, 504})
+
+# Read-only endpoints, safe to resend after a timeout or gateway error
+_IDEMPOTENT_ENDPOINTS = frozenset({"models", "fields", "search", "read", "read_many", "count", "info"})
+
+
+def _should_retry(exc: Exception, idempotent: bool) -> bool:
+    """Check whether an httpx error is transient and safe to retry"""
+    if isinstance(exc, (httpx.ConnectError, httpx.ConnectTimeout)):
+        # The request never reached Odoo
+        return True
+    if not idempotent:
+        # Odoo may already have applied it
+        return False
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in _RETRY_STATUS_CODES
+    return isinstance(exc, httpx.ReadTimeout)
+
+
+def _retry(max_attempts: int = 3, base_delay: float = 0.1):
+    """
+    Retry an async call on transient HTTP errors with exponential backoff.
+    
+    The wrapped call takes an ``idempotent`` keyword; when false, only
+    connection failures (request never sent) are retried.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, idempotent: bool = False, **kwargs):
+            for attempt in range(max_attempts):
+                try:
+                    return await func(*args, **kwargs)
+                except httpx.HTTPError as e:
+                    if attempt == max_attempts - 1 or not _should_retry(e, idempotent):
+                        raise
+                    await asyncio.sleep(base_delay * 2 ** attempt)
+        return wrapper
+    return decorator
+
+
+class _AsyncByteReader:
+    """Async file-like adapter over an async byte iterator, as ijson expects"""
+    
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks
+    
+    async def read(self, n: int = -1) -> bytes:
+        if n == 0:
+            return b""
+        return await anext(self._chunks, b"")
+
+
+async def _iter_search_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[dict]:
+    """Incrementally decode records from a streamed /mcp/search response"""
+    builder = None
+    depth = 0
+    rpc_error = False
+    messages = {}
+    
+    async for prefix, event, value in ijson.parse_async(_AsyncByteReader(chunks), use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+                if not depth:
+                    yield builder.value
+                    builder = None
+        elif prefix == "result.data.records.item" and event == "start_map":
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+            depth = 1
+        elif prefix == "error":
+            rpc_error = True
+            if event in ("string", "number", "boolean"):
+                # A plain error value rather than an error object
+                messages[prefix] = str(value)
+        elif prefix in ("error.message", "error.data.message", "result.error", "result.message"):
+            messages[prefix] = value
+    
+    if rpc_error:
+        msg = (
+            messages.get("error.data.message") or messages.get("error.message")
+            or messages.get("error") or "Unknown error"
+        )
+        raise OdooError(f"Odoo error: {msg}")
+    if messages.get("result.error"):
+        raise OdooError(messages.get("result.message", "Unknown error"))
 
 
 class OdooClient:
@@ -19,50 +132,91 @@ class OdooClient:
         user: Optional[str] = None,
         password: Optional[str] = None,
         timeout: int = 30,
+        schema_cache_ttl: Optional[int] = None,
     ):
+        settings = get_settings()
         self.url = (url or settings.url).rstrip('/')
         self.db = db or settings.db
         self.api_key = api_key or settings.api_key
         self.user = user or settings.user
         self.password = password or settings.password
         self.timeout = timeout or settings.timeout
+        self.schema_cache_ttl = (
+            settings.schema_cache_ttl if schema_cache_ttl is None else schema_cache_ttl
+        )
         
-        self._client = httpx.AsyncClient(timeout=self.timeout)
-    
-    async def _request(self, endpoint: str, **params) -> dict:
-        """Make a JSON-RPC request to Odoo MCP endpoint"""
-        url = f"{self.url}/mcp/{endpoint}"
+        # (endpoint, model) -> (fetch time, value); locks coalesce concurrent refreshes
+        self._schema_cache: dict[tuple, tuple[float, Any]] = {}
+        self._schema_locks: dict[tuple, asyncio.Lock] = {}
+        # (model, id) -> (fetch time, display name), kept in LRU order
+        self._name_cache: dict[tuple[str, int], tuple[float, str]] = {}
         
-        # Add authentication
+        # Built once and set as client defaults, so requests carry no per-call headers
+        self._json_headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+        
+        # One pooled client per OdooClient: all calls hit the same Odoo host, so
+        # keep-alive and HTTP/2 multiplexing amortize TCP+TLS setup across tool calls.
+        # _post retries transient failures on top: at most 3 attempts per call.
+        self._client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=20,
+                max_connections=100,
+                keepalive_expiry=60.0,
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=10.0),
+            headers=self._json_headers,
+        )
+    
+    def _add_auth(self, params: dict) -> dict:
+        """Add authentication parameters to a JSON-RPC params dict"""
         if self.api_key:
             params['api_key'] = self.api_key
         elif self.user and self.password:
             params['user'] = self.user
             params['password'] = self.password
+        return params
+    
+    @staticmethod
+    def _unwrap(result: dict, key: Optional[str] = None, default: Any = None) -> Any:
+        """Raise on a bridge-level error, else return result data (or data[key])"""
+        if result.get("error"):
+            raise OdooError(result.get("message", "Unknown error"))
+        data = result.get("data") or {}
+        return data if key is None else data.get(key, default)
+    
+    @staticmethod
+    def _rpc_error_message(error: Any) -> str:
+        """Extract a readable message from a JSON-RPC error object"""
+        if isinstance(error, dict):
+            return error.get("data", {}).get("message", str(error))
+        return str(error)
+    
+    @_retry(max_attempts=3, base_delay=0.1)
+    async def _post(self, url: str, body: bytes) -> httpx.Response:
+        """POST a JSON body, raising httpx.HTTPStatusError for error statuses"""
+        response = await self._client.post(url, content=body)
+        response.raise_for_status()
+        return response
+    
+    async def _request(self, endpoint: str, **params) -> dict:
+        """Make a JSON-RPC request to Odoo MCP endpoint"""
+        url = f"{self.url}/mcp/{endpoint}"
         
-        payload = {
-            "jsonrpc": "2.0",
-            "method": "call",
-            "params": params,
-            "id": 1,
-        }
+        # Add authentication
+        self._add_auth(params)
         
         try:
-            response = await self._client.post(
-                url,
-                json=payload,
-                headers={"Content-Type": "application/json"}
+            response = await self._post(
+                url, _envelope(params), idempotent=endpoint in _IDEMPOTENT_ENDPOINTS
             )
-            response.raise_for_status()
-            result = response.json()
+            result = orjson.loads(response.content)
             
             if "error" in result:
-                error = result["error"]
-                if isinstance(error, dict):
-                    msg = error.get("data", {}).get("message", str(error))
-                else:
-                    msg = str(error)
-                raise OdooError(f"Odoo error: {msg}")
+                raise OdooError(f"Odoo error: {self._rpc_error_message(result['error'])}")
             
             return result.get("result", {})
             
@@ -71,6 +225,104 @@ class OdooClient:
         except httpx.RequestError as e:
             raise OdooError(f"Connection error: {str(e)}")
     
+    async def batch(self, calls: list[dict]) -> list:
+        """
+        Execute several MCP calls in a single HTTP round trip.
+        
+        Calls are sent to ``/mcp/batch`` as a JSON-RPC 2.0 batch. Each call is a
+        dict with an ``endpoint`` (e.g. ``"search"``), optional ``params`` and an
+        optional ``input_from`` index of an earlier call whose result the Odoo
+        module feeds into this one, so dependent calls need no extra round trip.
+        
+        Returns the ``data`` payload of each call, in the order of ``calls``.
+        """
+        payload = []
+        for i, call in enumerate(calls):
+            if not isinstance(call, dict):
+                raise OdooError(f"Batch call {i} must be an object")
+            if not call.get("endpoint"):
+                raise OdooError(f"Batch call {i} has no endpoint")
+            params = call.get("params") or {}
+            if not isinstance(params, dict):
+                raise OdooError(f"Batch call {i}: params must be an object")
+            params = dict(params)
+            params["endpoint"] = call["endpoint"]
+            input_from = call.get("input_from")
+            if input_from is not None:
+                if not isinstance(input_from, int) or not 0 <= input_from < i:
+                    raise OdooError(
+                        f"Batch call {i}: input_from must reference an earlier call"
+                    )
+                params["input_from"] = input_from
+            payload.append({
+                "jsonrpc": "2.0",
+                "method": "call",
+                "params": self._add_auth(params),
+                "id": i,
+            })
+        
+        if not payload:
+            return []
+        
+        try:
+            response = await self._post(f"{self.url}/mcp/batch", orjson.dumps(payload))
+            replies = orjson.loads(response.content)
+        except httpx.HTTPStatusError as e:
+            raise OdooError(f"HTTP error {e.response.status_code}: {e.response.text}")
+        except httpx.RequestError as e:
+            raise OdooError(f"Connection error: {str(e)}")
+        except orjson.JSONDecodeError as e:
+            raise OdooError(f"Invalid response from Odoo: {str(e)}")
+        
+        if not isinstance(replies, list):
+            # A single error object is returned when the whole batch is rejected
+            error = replies.get("error", replies) if isinstance(replies, dict) else replies
+            raise OdooError(f"Odoo error: {self._rpc_error_message(error)}")
+        
+        # Malformed entries are dropped and surface as a missing response below
+        by_id = {reply.get("id"): reply for reply in replies if isinstance(reply, dict)}
+        results = []
+        for i, call in enumerate(calls):
+            reply = by_id.get(i)
+            if reply is None:
+                raise OdooError(f"Batch call {i} ({call['endpoint']}) got no response")
+            if "error" in reply:
+                msg = self._rpc_error_message(reply["error"])
+                raise OdooError(f"Odoo error in batch call {i} ({call['endpoint']}): {msg}")
+            result = reply.get("result") or {}
+            if not isinstance(result, dict):
+                raise OdooError(f"Batch call {i} ({call['endpoint']}) got an invalid response")
+            results.append(self._unwrap(result))
+        return results
+    
+    async def _cached(
+        self,
+        key: tuple,
+        ttl: float,
+        coro_factory: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Return the cached value for key, refetching it once older than ttl seconds"""
+        if ttl <= 0:
+            return await coro_factory()
+        
+        entry = self._schema_cache.get(key)
+        if entry and time.monotonic() - entry[0] < ttl:
+            return entry[1]
+        
+        lock = self._schema_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another task may have refreshed the entry while we waited
+            entry = self._schema_cache.get(key)
+            if entry and time.monotonic() - entry[0] < ttl:
+                return entry[1]
+            try:
+                value = await coro_factory()
+            except Exception:
+                self._schema_cache.pop(key, None)
+                raise
+            self._schema_cache[key] = (time.monotonic(), value)
+            return value
+    
     async def health_check(self) -> dict:
         """Check Odoo MCP Bridge health"""
         try:
@@ -84,18 +336,20 @@ class OdooClient:
         return await self._request("info")
     
     async def list_models(self) -> list:
-        """List enabled models"""
-        result = await self._request("models")
-        if result.get("error"):
-            raise OdooError(result.get("message", "Unknown error"))
-        return result.get("data", {}).get("models", [])
+        """List enabled models (cached for schema_cache_ttl seconds)"""
+        async def fetch():
+            result = await self._request("models")
+            return self._unwrap(result, "models", [])
+        
+        return list(await self._cached(("models", None), self.schema_cache_ttl, fetch))
     
     async def get_fields(self, model: str) -> list:
-        """Get field definitions for a model"""
-        result = await self._request("fields", model=model)
-        if result.get("error"):
-            raise OdooError(result.get("message", "Unknown error"))
-        return result.get("data", {}).get("fields", [])
+        """Get field definitions for a model (cached for schema_cache_ttl seconds)"""
+        async def fetch():
+            result = await self._request("fields", model=model)
+            return self._unwrap(result, "fields", [])
+        
+        return list(await self._cached(("fields", model), self.schema_cache_ttl, fetch))
     
     async def search(
         self,
@@ -116,9 +370,47 @@ class OdooClient:
             offset=offset,
             order=order,
         )
-        if result.get("error"):
-            raise OdooError(result.get("message", "Unknown error"))
-        return result.get("data", {}).get("records", [])
+        return self._unwrap(result, "records", [])
+    
+    async def search_stream(
+        self,
+        model: str,
+        domain: Optional[list] = None,
+        fields: Optional[list] = None,
+        limit: int = 80,
+        offset: int = 0,
+        order: Optional[str] = None,
+    ) -> AsyncIterator[dict]:
+        """
+        Search for records, yielding each one as it is decoded.
+        
+        The response body is parsed incrementally, so the full JSON document
+        and record list are never held in memory at once. Streamed requests
+        are not retried.
+        """
+        params = self._add_auth({
+            "model": model,
+            "domain": domain or [],
+            "fields": fields,
+            "limit": limit,
+            "offset": offset,
+            "order": order,
+        })
+        try:
+            async with self._client.stream(
+                "POST", f"{self.url}/mcp/search", content=_envelope(params)
+            ) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                async for record in _iter_search_records(response.aiter_bytes()):
+                    yield record
+        except httpx.HTTPStatusError as e:
+            raise OdooError(f"HTTP error {e.response.status_code}: {e.response.text}")
+        except httpx.RequestError as e:
+            raise OdooError(f"Connection error: {str(e)}")
+        except ijson.JSONError as e:
+            raise OdooError(f"Invalid response from Odoo: {str(e)}")
     
     async def read(
         self,
@@ -133,9 +425,73 @@ class OdooClient:
             record_id=record_id,
             fields=fields,
         )
-        if result.get("error"):
-            raise OdooError(result.get("message", "Unknown error"))
-        return result.get("data", {}).get("record", {})
+        return self._unwrap(result, "record", {})
+    
+    async def read_many(
+        self,
+        model: str,
+        ids: list,
+        fields: Optional[list] = None,
+    ) -> list:
+        """
+        Read several records with one /mcp/read call per ID.
+        
+        Calls run concurrently over the HTTP/2 pool, at most
+        _READ_MANY_CONCURRENCY at a time. Prefer read_batch, which needs a
+        single request; this is for bridges without /mcp/read_many.
+        """
+        semaphore = asyncio.Semaphore(_READ_MANY_CONCURRENCY)
+        
+        async def read_one(record_id):
+            async with semaphore:
+                return await self.read(model, record_id, fields)
+        
+        return list(await asyncio.gather(*[read_one(i) for i in ids]))
+    
+    async def read_batch(
+        self,
+        model: str,
+        ids: list[int],
+        fields: Optional[list] = None,
+    ) -> dict:
+        """Read several records in a single request, keyed by record ID"""
+        if not ids:
+            return {}
+        result = await self._request(
+            "read_many",
+            model=model,
+            record_ids=list(ids),
+            fields=fields,
+        )
+        records = self._unwrap(result, "records", [])
+        return {rec["id"]: rec for rec in records if "id" in rec}
+    
+    async def get_display_names(self, model: str, ids: list[int]) -> dict:
+        """Get display names by record ID, memoized per (model, id) for a short TTL"""
+        now = time.monotonic()
+        names = {}
+        missing = []
+        for rid in ids:
+            entry = self._name_cache.pop((model, rid), None)
+            if entry and now - entry[0] < _NAME_CACHE_TTL:
+                # Re-insert to mark as most recently used
+                self._name_cache[(model, rid)] = entry
+                names[rid] = entry[1]
+            else:
+                missing.append(rid)
+        
+        if missing:
+            records = await self.read_batch(model, missing, ['display_name'])
+            now = time.monotonic()
+            for rid, rec in records.items():
+                name = rec.get('display_name')
+                if name:
+                    names[rid] = name
+                    self._name_cache[(model, rid)] = (now, name)
+            while len(self._name_cache) > _NAME_CACHE_SIZE:
+                del self._name_cache[next(iter(self._name_cache))]
+        
+        return names
     
     async def count(
         self,
@@ -148,9 +504,7 @@ class OdooClient:
             model=model,
             domain=domain or [],
         )
-        if result.get("error"):
-            raise OdooError(result.get("message", "Unknown error"))
-        return result.get("data", {}).get("count", 0)
+        return self._unwrap(result, "count", 0)
     
     async def create(
         self,
@@ -163,9 +517,7 @@ class OdooClient:
             model=model,
             values=values,
         )
-        if result.get("error"):
-            raise OdooError(result.get("message", "Unknown error"))
-        return result.get("data", {}).get("id")
+        return self._unwrap(result, "id")
     
     async def write(
         self,
@@ -180,8 +532,7 @@ class OdooClient:
             record_id=record_id,
             values=values,
         )
-        if result.get("error"):
-            raise OdooError(result.get("message", "Unknown error"))
+        self._unwrap(result)
         return True
     
     async def unlink(
@@ -195,8 +546,7 @@ class OdooClient:
             model=model,
             record_id=record_id,
         )
-        if result.get("error"):
-            raise OdooError(result.get("message", "Unknown error"))
+        self._unwrap(result)
         return True
     
     async def execute(
@@ -216,13 +566,17 @@ class OdooClient:
             args=args,
             kwargs_data=kwargs,
         )
-        if result.get("error"):
-            raise OdooError(result.get("message", "Unknown error"))
-        return result.get("data", {}).get("result")
+        return self._unwrap(result, "result")
     
     async def close(self):
         """Close the HTTP client"""
         await self._client.aclose()
+    
+    async def __aenter__(self) -> "OdooClient":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
 
 
 class OdooError(Exception):
@@ -4,11 +4,18 @@ AD MCP Bridge Server - Main MCP Server Implementation
 This server exposes Odoo data through the Model Context Protocol (MCP),
 allowing AI assistants to interact with Odoo using natural language.
 """
+import asyncio
+import contextlib
+import io
+import itertools
 import json
-from typing import Optional
+import signal
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Callable, Optional
+import orjson
 from mcp.server.fastmcp import FastMCP
-from .odoo_client import get_client, OdooError
-from .config import settings
+from .odoo_client import get_client, close_client, OdooError
+from .config import get_settings
 
 
 # Initialize MCP server
@@ -18,6 +25,17 @@ mcp = FastMCP(
 )
 
 
+def _dumps(obj: Any) -> str:
+    """
+    Serialize potentially large payloads (schemas, method results) with orjson.
+    
+    Output is compact since the consumer is an LLM paying per token;
+    ODOO_DEBUG_PRETTY_JSON switches to indented output for debugging.
+    """
+    option = orjson.OPT_INDENT_2 if get_settings().debug_pretty_json else None
+    return orjson.dumps(obj, default=str, option=option).decode()
+
+
 # ============================================================================
 # RESOURCES - Data endpoints for read access
 # ============================================================================
@@ -27,7 +45,7 @@ async def resource_models() -> str:
     """List all models enabled for MCP access"""
     client = get_client()
     models = await client.list_models()
-    return json.dumps(models, indent=2, default=str)
+    return _dumps(models)
 
 
 @mcp.resource("odoo://model/{model_name}/fields")
@@ -35,7 +53,7 @@ async def resource_model_fields(model_name: str) -> str:
     """Get field definitions for a specific model"""
     client = get_client()
     fields = await client.get_fields(model_name)
-    return json.dumps(fields, indent=2, default=str)
+    return _dumps(fields)
 
 
 @mcp.resource("odoo://{model_name}/record/{record_id}")
@@ -43,6 +61,7 @@ async def resource_record(model_name: str, record_id: str) -> str:
     """Get a specific record by ID - Example: odoo://res.partner/record/1"""
     client = get_client()
     record = await client.read(model_name, int(record_id), None)
+    await resolve_missing_names(model_name, [record])
     return format_record(model_name, record)
 
 
@@ -89,19 +108,22 @@ async def search_records(
     """
     try:
         client = get_client()
-        records = await client.search(
+        max_records = get_settings().max_records
+        records = client.search_stream(
             model=model,
             domain=domain,
             fields=fields,
-            limit=min(limit, settings.max_records),
+            limit=min(limit, max_records),
             offset=offset,
             order=order,
         )
         
-        if not records:
-            return f"No records found in {model} matching the criteria."
-        
-        return format_records(model, records)
+        return await format_records_stream(
+            model,
+            records,
+            max_records=max_records,
+            empty_message=f"No records found in {model} matching the criteria.",
+        )
         
     except OdooError as e:
         return f"Error searching {model}: {str(e)}"
@@ -136,12 +158,53 @@ async def get_record(
         if not record:
             return f"Record {record_id} not found in {model}."
         
+        await resolve_missing_names(model, [record])
         return format_record(model, record)
         
     except OdooError as e:
         return f"Error reading {model} record {record_id}: {str(e)}"
 
 
+@mcp.tool()
+async def get_records(
+    model: str,
+    ids: list,
+    fields: Optional[list] = None,
+) -> str:
+    """
+    Get several records by ID in one call.
+    
+    Args:
+        model: The Odoo model name
+        ids: List of record IDs to retrieve
+        fields: List of fields to return (empty = all accessible fields)
+    
+    Returns:
+        The records data, in the order of ids
+    
+    Example:
+        Get several customers: model='res.partner', ids=[5, 7, 12]
+    """
+    try:
+        ids = [int(i) for i in ids[:get_settings().max_records]]
+    except (TypeError, ValueError):
+        return f"Invalid record IDs {ids}: expected a list of integers."
+    
+    try:
+        client = get_client()
+        by_id = await client.read_batch(model, ids, fields)
+        records = [by_id[i] for i in ids if i in by_id]
+        
+        if not records:
+            return f"No records {ids} found in {model}."
+        
+        await resolve_missing_names(model, records)
+        return format_records(model, records)
+        
+    except OdooError as e:
+        return f"Error reading {model} records {ids}: {str(e)}"
+
+
 @mcp.tool()
 async def count_records(
     model: str,
@@ -227,23 +290,19 @@ async def get_model_fields(
         fields = await client.get_fields(model)
         
         if field_types:
-            fields = [f for f in fields if f.get('type') in field_types]
+            wanted = frozenset(field_types)
+            fields = [f for f in fields if f.get('type') in wanted]
         
         if not fields:
             return f"No fields found for {model}."
         
         # Group by type for better readability
-        by_type = {}
-        for f in fields:
-            ftype = f.get('type', 'unknown')
-            if ftype not in by_type:
-                by_type[ftype] = []
-            by_type[ftype].append(f)
+        fields.sort(key=lambda f: (f.get('type', 'unknown'), f['name']))
         
         lines = [f"# Fields for {model}\n"]
-        for ftype, flist in sorted(by_type.items()):
+        for ftype, group in itertools.groupby(fields, key=lambda f: f.get('type', 'unknown')):
             lines.append(f"\n## {ftype.title()} Fields")
-            for f in sorted(flist, key=lambda x: x['name']):
+            for f in group:
                 req = " (required)" if f.get('required') else ""
                 ro = " [readonly]" if f.get('readonly') else ""
                 lines.append(f"- **{f['name']}**: {f.get('label', '')}{req}{ro}")
@@ -381,12 +440,41 @@ async def execute_method(
         if result is None:
             return f"✅ Method {method} executed successfully on {model}."
         
-        return f"✅ Method {method} result: {json.dumps(result, indent=2, default=str)}"
+        return f"✅ Method {method} result: {_dumps(result)}"
         
     except OdooError as e:
         return f"❌ Error executing {method} on {model}: {str(e)}"
 
 
+@mcp.tool()
+async def batch_execute(calls: list) -> str:
+    """
+    Execute several Odoo calls in a single round trip.
+
+    Args:
+        calls: List of calls, each a dict with:
+               - endpoint: MCP endpoint name (search, read, count, create, write, unlink, execute)
+               - params: Parameters for the endpoint (e.g., {'model': 'res.partner', 'domain': []})
+               - input_from: Optional index of an earlier call whose result feeds this one
+
+    Returns:
+        JSON list with the result of each call, in order
+
+    Example:
+        Create a partner then read it back:
+        calls=[{'endpoint': 'create', 'params': {'model': 'res.partner', 'values': {'name': 'ACME'}}},
+               {'endpoint': 'read', 'params': {'model': 'res.partner'}, 'input_from': 0}]
+    """
+    try:
+        client = get_client()
+        results = await client.batch(calls)
+
+        return _dumps(results)
+
+    except OdooError as e:
+        return f"❌ Error executing batch: {str(e)}"
+
+
 @mcp.tool()
 async def get_record_name(
     model: str,
@@ -434,6 +522,7 @@ async def search_and_read_one(
         if not records:
             return f"No record found in {model} matching {domain}."
         
+        await resolve_missing_names(model, records)
         return format_record(model, records[0])
         
     except OdooError as e:
@@ -444,36 +533,208 @@ async def search_and_read_one(
 # HELPER FUNCTIONS - Output Formatting
 # ============================================================================
 
+def _is_unnamed_many2one(value) -> bool:
+    """Check for a many2one value returned without its label: [id, False]"""
+    return (
+        isinstance(value, list) and len(value) == 2
+        and isinstance(value[0], int) and not value[1]
+    )
+
+
+async def resolve_missing_names(model: str, records: list) -> None:
+    """
+    Fill in display names for many2one values returned as [id, False].
+    
+    Labels are collected in a first pass, fetched with one memoized bulk
+    read per related model (all issued concurrently) and substituted in a
+    second pass. Values whose target or field definitions cannot be read
+    keep their raw ID.
+    """
+    missing = [
+        (rec, key) for rec in records
+        for key, value in rec.items() if _is_unnamed_many2one(value)
+    ]
+    if not missing:
+        return
+    
+    client = get_client()
+    try:
+        fields = await client.get_fields(model)
+    except OdooError:
+        # Labels are best-effort; keep the raw IDs
+        return
+    relations = {f['name']: f.get('relation') for f in fields}
+    needed: dict[str, set[int]] = {}
+    for rec, key in missing:
+        if relations.get(key):
+            needed.setdefault(relations[key], set()).add(rec[key][0])
+    
+    results = await asyncio.gather(
+        *[client.get_display_names(relation, list(ids)) for relation, ids in needed.items()],
+        return_exceptions=True,
+    )
+    names = {}
+    for relation, result in zip(needed, results):
+        if isinstance(result, OdooError):
+            # Unreadable target model: keep its raw IDs
+            continue
+        if isinstance(result, BaseException):
+            raise result
+        for rid, name in result.items():
+            names[(relation, rid)] = name
+    
+    for rec, key in missing:
+        rid = rec[key][0]
+        name = names.get((relations.get(key), rid))
+        if name:
+            rec[key] = [rid, name]
+
+
+def _fmt_list(value: list) -> str:
+    """Format a list value: many2one [id, name] pairs or a plain list"""
+    if len(value) == 2 and isinstance(value[0], int):
+        # Many2one field: [id, name]
+        return f"{value[1]} (ID: {value[0]})"
+    return ", ".join(str(v) for v in value)
+
+
+# Exact-type dispatch for field values; anything else formats with str()
+_VALUE_FORMATTERS = {
+    list: _fmt_list,
+    str: str,
+    int: str,
+    float: str,
+    bool: str,
+}
+
+
+_RECORDS_SKIP_KEYS = frozenset({'id', 'display_name', 'name', '__last_update'})
+
+
+def _fmt_value(value) -> str:
+    """Format a field value for format_records"""
+    fmt = _VALUE_FORMATTERS.get(type(value))
+    if fmt is None:
+        fmt = _fmt_list if isinstance(value, list) else str
+    return fmt(value)
+
+
 def format_records(model: str, records: list) -> str:
     """Format a list of records for output"""
     if not records:
         return f"No records found in {model}."
     
-    lines = [f"# Found {len(records)} records in {model}\n"]
+    buf = io.StringIO()
+    w = buf.write
+    w(f"# Found {len(records)} records in {model}\n\n")
     
     for rec in records:
-        rec_id = rec.get('id', '?')
-        name = rec.get('display_name') or rec.get('name') or f"ID {rec_id}"
-        lines.append(f"## {name} (ID: {rec_id})")
-        
-        for key, value in rec.items():
-            if key in ('id', 'display_name', 'name', '__last_update'):
-                continue
-            if value is None or value == '' or value is False:
-                continue
-            
-            # Format different types
-            if isinstance(value, list) and len(value) == 2 and isinstance(value[0], int):
-                # Many2one field: [id, name]
-                value = f"{value[1]} (ID: {value[0]})"
-            elif isinstance(value, list):
-                value = ", ".join(str(v) for v in value)
-            
-            lines.append(f"- **{key}**: {value}")
+        _write_record(w, rec)
+    
+    # Drop the separator written after the last record
+    return buf.getvalue()[:-1]
+
+
+async def format_records_stream(
+    model: str,
+    records: AsyncIterator[dict],
+    max_records: Optional[int] = None,
+    empty_message: Optional[str] = None,
+    chunk_size: int = 50,
+) -> str:
+    """
+    Format records as they arrive from an async iterator.
+    
+    Records are written out in chunks of chunk_size (after resolving their
+    missing many2one labels) and then dropped, so only one chunk is held in
+    memory. Reading stops once max_records records have been written.
+    """
+    buf = io.StringIO()
+    w = buf.write
+    count = 0
+    chunk = []
+    
+    async def flush():
+        await resolve_missing_names(model, chunk)
+        for rec in chunk:
+            _write_record(w, rec)
+        chunk.clear()
+    
+    async with contextlib.aclosing(records):
+        async for rec in records:
+            chunk.append(rec)
+            count += 1
+            if max_records is not None and count >= max_records:
+                break
+            if len(chunk) >= chunk_size:
+                await flush()
+    await flush()
+    
+    if not count:
+        return empty_message or f"No records found in {model}."
+    
+    # Drop the separator written after the last record
+    return f"# Found {count} records in {model}\n\n" + buf.getvalue()[:-1]
+
+
+def _write_record(w: Callable[[str], Any], rec: dict) -> None:
+    """Write one record section of format_records output"""
+    rec_id = rec.get('id', '?')
+    name = rec.get('display_name') or rec.get('name') or f"ID {rec_id}"
+    w(f"## {name} (ID: {rec_id})\n")
+    
+    for key, value in rec.items():
+        if key in _RECORDS_SKIP_KEYS:
+            continue
+        # Identity/type checks only: value == '' would run list.__eq__ etc.
+        t = type(value)
+        if value is None or value is False or ((t is str or t is list) and not value):
+            continue
         
-        lines.append("")  # Empty line between records
+        w(f"- **{key}**: {_fmt_value(value)}\n")
     
-    return "\n".join(lines)
+    w("\n")  # Empty line between records
+
+
+# format_record output sections
+_BASIC, _RELATION, _OTHER = range(3)
+
+
+def _classify_list(value: list) -> tuple:
+    if len(value) == 2 and isinstance(value[0], int):
+        # Many2one field
+        return _RELATION, f"{value[1]} (ID: {value[0]})"
+    # O2M/M2M field
+    return _OTHER, f"{len(value)} items: {value[:5]}{'...' if len(value) > 5 else ''}"
+
+
+def _classify_basic(value) -> tuple:
+    return _BASIC, value
+
+
+def _classify_other(value) -> tuple:
+    return _OTHER, str(value)
+
+
+def _classify_fallback(value) -> tuple:
+    """Classify subclasses and other types the exact-type table misses"""
+    if isinstance(value, list):
+        return _classify_list(value)
+    if isinstance(value, (str, int, float, bool)):
+        return _classify_basic(value)
+    return _classify_other(value)
+
+
+# Exact-type dispatch: value -> (section, formatted value)
+_RECORD_DISPATCH = {
+    list: _classify_list,
+    str: _classify_basic,
+    int: _classify_basic,
+    float: _classify_basic,
+    bool: _classify_basic,
+}
+
+_RECORD_SKIP_KEYS = frozenset({'id', 'display_name', '__last_update'})
 
 
 def format_record(model: str, record: dict) -> str:
@@ -483,28 +744,20 @@ def format_record(model: str, record: dict) -> str:
     
     lines = [f"# {model}: {name} (ID: {rec_id})\n"]
     
-    # Group fields by type for readability
-    basic_fields = []
-    relation_fields = []
-    other_fields = []
+    # Group fields by type for readability: basic, relation, other
+    sections = ([], [], [])
     
     for key, value in record.items():
-        if key in ('id', 'display_name', '__last_update'):
+        if key in _RECORD_SKIP_KEYS:
             continue
-        if value is None or value == '' or value is False:
+        t = type(value)
+        if value is None or value is False or ((t is str or t is list) and not value):
             continue
         
-        if isinstance(value, list) and len(value) == 2 and isinstance(value[0], int):
-            # Many2one field
-            relation_fields.append((key, f"{value[1]} (ID: {value[0]})"))
-        elif isinstance(value, list):
-            # O2M/M2M field
-            if value:
-                other_fields.append((key, f"{len(value)} items: {value[:5]}{'...' if len(value) > 5 else ''}"))
-        elif isinstance(value, (str, int, float, bool)):
-            basic_fields.append((key, value))
-        else:
-            other_fields.append((key, str(value)))
+        section, value = _RECORD_DISPATCH.get(t, _classify_fallback)(value)
+        sections[section].append((key, value))
+    
+    basic_fields, relation_fields, other_fields = sections
     
     if basic_fields:
         lines.append("## Basic Information")
@@ -528,10 +781,41 @@ def format_record(model: str, record: dict) -> str:
 # MAIN ENTRY POINT
 # ============================================================================
 
+_LOOPBACK_HOSTS = frozenset({"127.0.0.1", "localhost", "::1"})
+
+
+async def _run(transport: str, host: str, port: int) -> None:
+    """Run the MCP server, closing the Odoo client when it stops"""
+    # Turn SIGTERM into a cancellation so the exit stack unwinds
+    main_task = asyncio.current_task()
+    with contextlib.suppress(NotImplementedError):  # not supported on Windows
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+    
+    async with AsyncExitStack() as stack:
+        stack.push_async_callback(close_client)
+        
+        # Warm the connection pool (TCP, TLS, HTTP/2 settings) while the MCP
+        # session initializes, so the first tool call doesn't pay for it
+        warmup = asyncio.create_task(get_client().health_check())
+        stack.callback(warmup.cancel)
+        
+        if transport == 'streamable-http':
+            mcp.settings.host = host
+            mcp.settings.port = port
+            if host not in _LOOPBACK_HOSTS and getattr(mcp.settings, "transport_security", None):
+                # FastMCP was built for 127.0.0.1, which limits DNS-rebinding
+                # protection to localhost Host headers and rejects remote clients
+                mcp.settings.transport_security = None
+            await mcp.run_streamable_http_async()
+        else:
+            await mcp.run_stdio_async()
+
+
 def main():
     """Entry point for the MCP server"""
     import argparse
     
+    settings = get_settings()
     parser = argparse.ArgumentParser(description="AD MCP Bridge Server for Odoo")
     parser.add_argument(
         '--transport',
@@ -544,11 +828,17 @@ def main():
     
     args = parser.parse_args()
     
-    # Configure transport
-    if args.transport == 'streamable-http':
-        mcp.run(transport='streamable-http', host=args.host, port=args.port)
-    else:
-        mcp.run(transport='stdio')
+    # Prefer the uvloop event loop where it is installed (not available on Windows)
+    try:
+        import uvloop
+        run = uvloop.run
+    except ImportError:
+        run = asyncio.run
+    
+    try:
+        run(_run(args.transport, args.host, args.port))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
 
 
 if __name__ == "__main__":